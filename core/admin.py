@@ -1,7 +1,11 @@
+from decimal import Decimal
+
+from django import forms
 from django.contrib import admin
 from django.contrib.auth import authenticate, login
 from django.shortcuts import redirect, render
-from .models import Bundle, Purchase
+from .models import Bundle, Purchase, WalletTransaction
+from .wallet import credit
 
 
 # Secure admin login: only staff/superusers allowed
@@ -32,6 +36,44 @@ class BundleAdmin(admin.ModelAdmin):
 # Purchase admin configuration
 @admin.register(Purchase)
 class PurchaseAdmin(admin.ModelAdmin):
-    list_display = ("user", "bundle", "recipient", "amount", "paid", "api_transaction_id", "created_at")
-    list_filter = ("paid",)
+    list_display = ("user", "bundle", "recipient", "amount", "paid", "delivered", "api_transaction_id", "created_at")
+    list_filter = ("paid", "delivered")
     search_fields = ("recipient", "api_transaction_id")
+
+
+class WalletTopUpForm(forms.ModelForm):
+    class Meta:
+        model = WalletTransaction
+        fields = ("profile", "amount", "note")
+
+    def clean_amount(self):
+        amount = self.cleaned_data["amount"]
+        if amount is not None and amount < Decimal("0.01"):
+            raise forms.ValidationError("Top-up amount must be positive.")
+        return amount
+
+    def clean_profile(self):
+        profile = self.cleaned_data["profile"]
+        if profile and not profile.is_agent:
+            raise forms.ValidationError("Only agents have a wallet.")
+        return profile
+
+
+# Wallet ledger: append-only; adding an entry tops up the agent's wallet
+@admin.register(WalletTransaction)
+class WalletTransactionAdmin(admin.ModelAdmin):
+    form = WalletTopUpForm
+    list_display = ("profile", "kind", "amount", "balance_after", "purchase", "created_at")
+    list_filter = ("kind",)
+    search_fields = ("profile__user__username", "note")
+    fields = ("profile", "amount", "note")
+
+    def save_model(self, request, obj, form, change):
+        entry = credit(obj.profile, obj.amount, note=obj.note or f"Top-up by {request.user.username}")
+        obj.pk = entry.pk
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -2,3 +2,7 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field='django.db.models.BigAutoField'
     name='core'
+    def ready(self):
+        # Build the phone prefix -> network table once per process
+        from .networks import get_resolver
+        get_resolver()
@@ -0,0 +1,96 @@
+# core/management/commands/bench_webhook.py
+import hashlib
+import hmac
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from core.models import Bundle, Purchase
+from core.views import paystack_webhook
+
+
+def legacy_webhook(request):
+    """The pre-signature handler: parse every body, then look the reference up in the database."""
+    try:
+        payload = json.loads(request.body.decode("utf-8"))
+    except Exception:
+        return HttpResponse(status=400)
+
+    event = payload.get("event")
+    data = payload.get("data", {})
+
+    if event == "charge.success":
+        try:
+            Purchase.objects.get(reference=data.get("reference"), paid=False)
+        except Purchase.DoesNotExist:
+            pass
+
+    return HttpResponse(status=200)
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark paystack_webhook against the old parse-first handler under a flood of "
+        "invalid requests. Runs against a throwaway test database; makes no network calls."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("-n", "--requests", type=int, default=20000, help="Requests per scenario")
+        parser.add_argument("--purchases", type=int, default=5000, help="Purchase rows to seed the test database with")
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(verbosity=0)
+        try:
+            self._seed(options["purchases"])
+            self._run(options["requests"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _seed(self, count):
+        user = User.objects.create_user(username="bench")
+        bundle = Bundle.objects.create(name="Bench 1GB", code="bench", price=5)
+        Purchase.objects.bulk_create(
+            Purchase(user=user, recipient="0541234567", bundle=bundle, amount=5) for _ in range(count)
+        )
+
+    def _run(self, n):
+        secret = "bench-secret"
+        factory = RequestFactory()
+
+        # A realistic charge.success body for a reference that does not exist, as forged traffic would send
+        body = json.dumps({
+            "event": "charge.success",
+            "data": {"reference": "forged-reference", "metadata": {"custom_fields": [{"value": "x" * 64}] * 20}},
+        }).encode()
+        other_event = body.replace(b"charge.success", b"transfer.failed")
+        oversized = b"{" + b" " * (64 * 1024) + b"}"
+
+        def sign(raw):
+            return hmac.new(secret.encode(), raw, hashlib.sha512).hexdigest()
+
+        scenarios = [
+            ("missing signature", body, {}),
+            ("forged signature", body, {"HTTP_X_PAYSTACK_SIGNATURE": "0" * 128}),
+            ("oversized body", oversized, {"HTTP_X_PAYSTACK_SIGNATURE": sign(oversized)}),
+            ("signed, other event", other_event, {"HTTP_X_PAYSTACK_SIGNATURE": sign(other_event)}),
+        ]
+
+        def timed(view, raw, headers):
+            status = None
+            start = time.perf_counter()
+            for _ in range(n):
+                request = factory.post("/paystack-webhook/", data=raw, content_type="application/json", **headers)
+                status = view(request).status_code
+            return status, (time.perf_counter() - start) / n * 1e6
+
+        with override_settings(PAYSTACK_SECRET_KEY=secret, ALLOWED_HOSTS=["*"], SECURE_SSL_REDIRECT=False):
+            self.stdout.write(f"{'scenario':<24}{'old status':>11}{'old us':>10}{'new status':>12}{'new us':>10}")
+            for name, raw, headers in scenarios:
+                old_status, old_us = timed(legacy_webhook, raw, headers)
+                new_status, new_us = timed(paystack_webhook, raw, headers)
+                self.stdout.write(f"{name:<24}{old_status:>11}{old_us:>10.1f}{new_status:>12}{new_us:>10.1f}")
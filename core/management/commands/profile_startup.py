@@ -0,0 +1,84 @@
+# core/management/commands/profile_startup.py
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Fresh interpreter: time from first project import to a ready WSGI application
+BOOT_SNIPPET = (
+    "import time; t = time.perf_counter(); "
+    "import {module}; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def parse_importtime(stderr):
+    """
+    Parse `python -X importtime` output into (module, self_us, cumulative_us) tuples.
+    Lines look like: 'import time:       412 |       1290 |   django.utils'.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # header line
+        rows.append((parts[2].strip(), self_us, cumulative_us))
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Report per-module import time (-X importtime) and worker boot time for the WSGI application."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--module", default=settings.WSGI_APPLICATION.rsplit(".", 1)[0],
+                            help="Module to import (default: the WSGI module)")
+        parser.add_argument("--top", type=int, default=25, help="Rows to show in the module table")
+        parser.add_argument("--runs", type=int, default=5, help="Fresh-process boots to time")
+
+    def _run(self, args):
+        result = subprocess.run([sys.executable, *args], cwd=settings.BASE_DIR, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise CommandError(f"Importing failed:\n{result.stderr[-2000:]}")
+        return result
+
+    def handle(self, *args, **options):
+        module, top, runs = options["module"], options["top"], options["runs"]
+
+        rows = parse_importtime(self._run(["-X", "importtime", "-c", f"import {module}"]).stderr)
+        if not rows:
+            raise CommandError("No -X importtime output to parse.")
+
+        # Per-module table, slowest cumulative first
+        self.stdout.write(f"Import time for {module} ({len(rows)} modules)\n")
+        self.stdout.write(f"{'cumulative ms':>14}{'self ms':>10}  module")
+        for name, self_us, cumulative_us in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+            self.stdout.write(f"{cumulative_us / 1000:>14.1f}{self_us / 1000:>10.1f}  {name}")
+
+        # Self time summed per top-level package shows which dependencies cost the most
+        packages = defaultdict(int)
+        for name, self_us, _ in rows:
+            packages[name.split(".")[0]] += self_us
+        self.stdout.write(f"\n{'self ms':>14}  package")
+        for name, self_us in sorted(packages.items(), key=lambda p: p[1], reverse=True)[:top]:
+            self.stdout.write(f"{self_us / 1000:>14.1f}  {name}")
+
+        total_us = sum(self_us for _, self_us, _ in rows)
+        self.stdout.write(f"\n{total_us / 1000:>14.1f}  total import self time")
+
+        # Worker boot: repeated cold imports in fresh interpreters
+        snippet = BOOT_SNIPPET.format(module=module)
+        timings = [float(self._run(["-c", snippet]).stdout.strip().splitlines()[-1]) for _ in range(runs)]
+        self.stdout.write(
+            f"\nBoot time for {module} over {runs} runs: "
+            f"min {min(timings) * 1000:.1f} ms, median {statistics.median(timings) * 1000:.1f} ms, "
+            f"max {max(timings) * 1000:.1f} ms"
+        )
@@ -0,0 +1,87 @@
+# core/management/commands/stress_wallet.py
+import threading
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+
+from core.models import Profile
+from core.wallet import InsufficientFunds, credit, debit, ledger_balance
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer one agent wallet with parallel debits and check for lost updates. Runs against a "
+        "throwaway test database built from DATABASES['default']; point DATABASE_URL at PostgreSQL "
+        "for a meaningful result, since SQLite serialises writers and ignores select_for_update."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--debits", type=int, default=25, help="Debits per thread")
+        parser.add_argument("--amount", type=Decimal, default=Decimal("1.00"))
+        parser.add_argument("--balance", type=Decimal, default=None,
+                            help="Starting balance (default: enough for about 3/4 of the debits)")
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(verbosity=0)
+        try:
+            self._run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _run(self, options):
+        threads, per_thread, amount = options["threads"], options["debits"], options["amount"]
+        start_balance = options["balance"]
+        if start_balance is None:
+            start_balance = amount * (threads * per_thread * 3 // 4)
+
+        user = User.objects.create_user(username="stress")
+        profile = Profile.objects.get(user=user)
+        profile.is_agent = True
+        profile.save()
+
+        counts = {"ok": 0, "insufficient": 0, "db_error": 0}
+        lock = threading.Lock()
+        barrier = threading.Barrier(threads)
+
+        def worker():
+            barrier.wait()
+            try:
+                for _ in range(per_thread):
+                    try:
+                        debit(profile, amount, note="stress")
+                        outcome = "ok"
+                    except InsufficientFunds:
+                        outcome = "insufficient"
+                    except OperationalError:
+                        outcome = "db_error"
+                    with lock:
+                        counts[outcome] += 1
+            finally:
+                connection.close()
+
+        credit(profile, start_balance, note="stress seed")
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+
+        cached = Profile.objects.get(pk=profile.pk).wallet_balance
+        ledger = ledger_balance(profile)
+        expected = start_balance - amount * counts["ok"]
+
+        self.stdout.write(f"starting balance   {start_balance}")
+        self.stdout.write(f"debits attempted   {threads * per_thread} ({threads} threads x {per_thread})")
+        self.stdout.write(f"succeeded          {counts['ok']}")
+        self.stdout.write(f"insufficient funds {counts['insufficient']}")
+        self.stdout.write(f"database errors    {counts['db_error']}")
+        self.stdout.write(f"expected balance   {expected}")
+        self.stdout.write(f"cached balance     {cached}")
+        self.stdout.write(f"ledger balance     {ledger}")
+
+        if cached != expected or ledger != expected or cached < 0:
+            raise CommandError("Lost update detected: balances do not agree.")
+        self.stdout.write(self.style.SUCCESS("OK: no lost updates."))
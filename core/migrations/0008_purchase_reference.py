@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:12
+
+import core.models
+from django.db import migrations, models
+
+
+def populate_reference(apps, schema_editor):
+    # Existing purchases were sent to Paystack with their id as the reference
+    Purchase = apps.get_model('core', 'Purchase')
+    for purchase in Purchase.objects.filter(reference__isnull=True).only('id'):
+        purchase.reference = str(purchase.id)
+        purchase.save(update_fields=['reference'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_bundle_color_bundle_logo_bundle_network'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchase',
+            name='reference',
+            field=models.CharField(editable=False, max_length=64, null=True),
+        ),
+        migrations.RunPython(populate_reference, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='purchase',
+            name='reference',
+            field=models.CharField(default=core.models.new_reference, editable=False, max_length=64, unique=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def mark_paid_delivered(apps, schema_editor):
+    # Delivery was not tracked before; treat purchases that were already paid as delivered
+    Purchase = apps.get_model('core', 'Purchase')
+    Purchase.objects.filter(paid=True).update(delivered=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_agent_wallet'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchase',
+            name='delivered',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_paid_delivered, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='wallettransaction',
+            name='kind',
+            field=models.CharField(choices=[('topup', 'Top-up'), ('purchase', 'Bundle purchase'), ('refund', 'Refund')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='wallettransaction',
+            name='purchase',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='wallet_transactions', to='core.purchase'),
+        ),
+    ]
@@ -6,7 +6,14 @@ class Profile(models.Model):
     user = models.OneToOneField(User,on_delete=models.CASCADE)
     is_agent = models.BooleanField(default=False)
     phone = models.CharField(max_length=30,blank=True)
+    # Cached sum of WalletTransaction.amount; only change it through core.wallet
+    wallet_balance = models.DecimalField(max_digits=12,decimal_places=2,default=0)
     def __str__(self): return f'Profile({self.user.username})'
+    def save(self,*args,**kwargs):
+        # Never write back a stale wallet_balance (e.g. from the save_profile signal)
+        if self.pk and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields']=[f.name for f in self._meta.concrete_fields if not f.primary_key and f.name!='wallet_balance']
+        super().save(*args,**kwargs)
 @receiver(post_save,sender=User)
 def create_profile(sender,instance,created,**kwargs):
     if created: Profile.objects.create(user=instance)
@@ -17,6 +24,12 @@ from django.contrib.auth.models import User
 
 import uuid
 
+
+def new_reference():
+    """Opaque Paystack reference, generated before the Purchase is saved."""
+    return uuid.uuid4().hex
+
+
 class Bundle(models.Model):
     name = models.CharField(max_length=100)
     code = models.CharField(max_length=50, unique=True)
@@ -38,4 +51,28 @@ class Purchase(models.Model):
     paid = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     paid_at = models.DateTimeField(null=True, blank=True)  # <-- Add this
-    api_transaction_id = models.CharField(max_length=50, null=True, blank=True)
\ No newline at end of file
+    api_transaction_id = models.CharField(max_length=50, null=True, blank=True)
+    delivered = models.BooleanField(default=False)
+    reference = models.CharField(max_length=64, unique=True, default=new_reference, editable=False)
+
+
+class WalletTransaction(models.Model):
+    """Append-only ledger of agent wallet top-ups (+), bundle debits (-) and failed-delivery refunds (+)."""
+    TOPUP = "topup"
+    PURCHASE = "purchase"
+    REFUND = "refund"
+    KIND_CHOICES = [(TOPUP, "Top-up"), (PURCHASE, "Bundle purchase"), (REFUND, "Refund")]
+
+    profile = models.ForeignKey(Profile, on_delete=models.PROTECT, related_name="wallet_transactions")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    balance_after = models.DecimalField(max_digits=12, decimal_places=2)
+    purchase = models.ForeignKey(Purchase, on_delete=models.PROTECT, null=True, blank=True, related_name="wallet_transactions")
+    note = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.amount} ({self.profile.user.username})"
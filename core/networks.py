@@ -0,0 +1,122 @@
+# core/networks.py
+import json
+import re
+from pathlib import Path
+
+PREFIX_FILE = Path(__file__).resolve().parent / "data" / "network_prefixes.json"
+
+
+class PrefixTrie:
+    """
+    Digit trie mapping number prefixes to a network name.
+    Lookups walk at most len(number) nodes and return the longest match.
+    """
+
+    _END = "$"
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, prefix, network):
+        node = self.root
+        for digit in prefix:
+            node = node.setdefault(digit, {})
+        node[self._END] = network
+
+    def longest_match(self, number):
+        node = self.root
+        match = None
+        for digit in number:
+            node = node.get(digit)
+            if node is None:
+                break
+            match = node.get(self._END, match)
+        return match
+
+
+class NetworkResolver:
+    """
+    Resolves Ghana phone numbers to a Bundle.network value (MTN, Telecel, AirtelTigo).
+    Build it once with from_file(); resolve() does no I/O.
+    """
+
+    def __init__(self, networks, aliases=None, name_keywords=None, country_code="233", national_length=10):
+        self.country_code = country_code
+        self.national_length = national_length
+        self.trie = PrefixTrie()
+        for network, prefixes in networks.items():
+            for prefix in prefixes:
+                self.trie.insert(prefix, network)
+
+        # Exact Bundle.network values ("Vodafone", "AT", "airtel tigo") -> canonical name
+        self.aliases = {network.lower(): network for network in networks}
+        for network, names in (aliases or {}).items():
+            for name in names:
+                self.aliases[name.lower()] = network
+
+        # Unambiguous names only for searching plan titles; "at" or "tigo" would match ordinary words
+        self.keywords = {network.lower(): network for network in networks}
+        for network, names in (name_keywords or {}).items():
+            for name in names:
+                self.keywords[name.lower()] = network
+        # Longest keywords first so "airtel tigo" wins over shorter overlaps
+        pattern = "|".join(re.escape(k) for k in sorted(self.keywords, key=len, reverse=True))
+        self._keyword_re = re.compile(rf"\b({pattern})\b", re.IGNORECASE)
+
+    @classmethod
+    def from_file(cls, path=PREFIX_FILE):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            data["networks"],
+            aliases=data.get("aliases"),
+            name_keywords=data.get("name_keywords"),
+            country_code=data.get("country_code", "233"),
+            national_length=data.get("national_length", 10),
+        )
+
+    def normalize(self, number):
+        """
+        Turn '+233 54 123 4567', '233541234567' or '054-123-4567' into '0541234567'.
+        Returns None if the input is not a valid national number.
+        """
+        if not number:
+            return None
+        digits = "".join(ch for ch in str(number) if ch.isdigit())
+        if digits.startswith(self.country_code) and len(digits) == len(self.country_code) + self.national_length - 1:
+            digits = "0" + digits[len(self.country_code):]
+        if len(digits) != self.national_length or not digits.startswith("0"):
+            return None
+        return digits
+
+    def lookup(self, digits):
+        """Network for a number already passed through normalize(), or None."""
+        return self.trie.longest_match(digits) if digits else None
+
+    def resolve(self, number):
+        """Return the network name for a number, or None if invalid/unknown."""
+        return self.lookup(self.normalize(number))
+
+    def canonical_network(self, name):
+        """Map a Bundle.network value such as 'Vodafone' or 'AT' to MTN/Telecel/AirtelTigo, or None."""
+        return self.aliases.get((name or "").strip().lower())
+
+    def guess_network(self, name):
+        """Find a network named in a plan title like 'Telecel 2GB', using unambiguous keywords only."""
+        match = self._keyword_re.search(name or "")
+        return self.keywords[match.group(1).lower()] if match else None
+
+    def filter_bundles(self, bundles, network):
+        """Keep only the bundles for a resolved network (e.g. the result of lookup())."""
+        return [b for b in bundles if self.canonical_network(b.network) == network]
+
+
+_resolver = None
+
+
+def get_resolver():
+    """Return the shared resolver, loading the prefix table on first use."""
+    global _resolver
+    if _resolver is None:
+        _resolver = NetworkResolver.from_file()
+    return _resolver
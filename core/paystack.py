@@ -0,0 +1,124 @@
+# core/paystack.py
+import hashlib
+import hmac
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Purchase
+
+PAYSTACK_INITIALIZE_URL = "https://api.paystack.co/transaction/initialize"
+
+# Paystack webhook bodies are a few KB; anything much bigger is not from Paystack
+WEBHOOK_MAX_BYTES = 64 * 1024
+
+# How long a retried checkout may reuse the same authorization URL: a double-click
+# window, not a session. The reference is also re-checked against the database.
+CHECKOUT_CACHE_SECONDS = 60
+
+# Placeholder stored while the first of several identical submissions talks to Paystack.
+# Outlives the initialize timeout so a stuck claim eventually expires.
+CHECKOUT_PENDING = "pending"
+CHECKOUT_CLAIM_SECONDS = 30
+
+# Shared pool so the Paystack round-trip can run while the Purchase is inserted
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="paystack")
+
+
+def initialize_transaction(email, amount, reference, callback_url, recipient):
+    """
+    Call Paystack /transaction/initialize.
+    Returns the authorization URL, or raises ValueError with Paystack's message.
+    """
+    headers = {"Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}"}
+    data = {
+        "email": email,
+        "amount": int(amount * 100),
+        "reference": reference,
+        "callback_url": callback_url,
+        "metadata": {"custom_fields": [{"display_name": "Recipient", "variable_name": "recipient", "value": recipient}]}
+    }
+    r = requests.post(PAYSTACK_INITIALIZE_URL, headers=headers, json=data, timeout=15)
+    res = r.json()
+    if not res.get("status"):
+        raise ValueError(res.get("message"))
+    return res["data"]["authorization_url"]
+
+
+def submit_initialize(*args, **kwargs):
+    """Start initialize_transaction() in the background and return its Future."""
+    return _executor.submit(initialize_transaction, *args, **kwargs)
+
+
+def checkout_cache_key(user_id, recipient, bundle_id):
+    digest = hashlib.sha256(f"{user_id}:{recipient}:{bundle_id}".encode()).hexdigest()
+    return f"paystack:checkout:{digest}"
+
+
+def get_cached_checkout(user_id, recipient, bundle_id):
+    """
+    Authorization URL from an identical recent submission, if any.
+    Skipped once its reference is paid, since the cache may not have seen the webhook
+    (LocMemCache is per worker).
+    """
+    key = checkout_cache_key(user_id, recipient, bundle_id)
+    checkout = cache.get(key)
+    if not checkout or checkout == CHECKOUT_PENDING:
+        return None
+    if not Purchase.objects.filter(reference=checkout["reference"], paid=False).exists():
+        cache.delete(key)
+        return None
+    return checkout["url"]
+
+
+def claim_checkout(user_id, recipient, bundle_id):
+    """
+    Atomically reserve this checkout before calling Paystack.
+    False means an identical submission already holds the claim.
+    """
+    return cache.add(checkout_cache_key(user_id, recipient, bundle_id), CHECKOUT_PENDING, CHECKOUT_CLAIM_SECONDS)
+
+
+def wait_for_checkout(user_id, recipient, bundle_id, timeout=5, interval=0.1):
+    """
+    Poll for the URL produced by the submission holding the claim.
+    Returns None if that submission failed (claim released) or it takes too long.
+    This blocks a sync gunicorn worker while it polls, so the timeout is kept to
+    about one Paystack initialize round-trip.
+    """
+    key = checkout_cache_key(user_id, recipient, bundle_id)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        checkout = cache.get(key)
+        if checkout is None:
+            return None
+        if checkout != CHECKOUT_PENDING:
+            return checkout["url"]
+        time.sleep(interval)
+    return None
+
+
+def cache_checkout(user_id, recipient, bundle_id, reference, auth_url):
+    checkout = {"reference": reference, "url": auth_url}
+    cache.set(checkout_cache_key(user_id, recipient, bundle_id), checkout, CHECKOUT_CACHE_SECONDS)
+
+
+def clear_checkout(user_id, recipient, bundle_id):
+    """Forget the cached URL or claim (after payment, or when initialization failed)."""
+    cache.delete(checkout_cache_key(user_id, recipient, bundle_id))
+
+
+def verify_signature(body, signature):
+    """
+    Check x-paystack-signature: HMAC-SHA512 of the raw body keyed with the secret key.
+    Uses a constant-time comparison.
+    """
+    secret = settings.PAYSTACK_SECRET_KEY
+    # compare_digest raises TypeError on non-ASCII str; a real signature is hex anyway
+    if not secret or not signature or not signature.isascii():
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha512).hexdigest()
+    return hmac.compare_digest(expected.encode(), signature.encode())
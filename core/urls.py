@@ -8,6 +8,7 @@ urlpatterns = [
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
     path('buy-bundle/', views.buy_bundle, name='buy_bundle'),
+    path('resolve-network/', views.resolve_network, name='resolve_network'),
     path('payment-success/', views.payment_success, name='payment_success'),
     path('my-purchases/', views.my_purchases, name='my_purchases'),
     path('profile/', views.profile, name='profile'),
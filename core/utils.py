@@ -2,8 +2,52 @@
 import requests
 from django.conf import settings
 from .models import Bundle
+from .networks import get_resolver
 from decimal import Decimal
 
+def deliver_bundle(purchase):
+    """
+    Ask DataDash to deliver a paid purchase to its recipient.
+    On success stores the order id in api_transaction_id and marks the purchase
+    delivered. Returns True if DataDash accepted the order, False otherwise.
+    """
+    headers = {
+        "Authorization": f"Bearer {settings.DATADASH_API_KEY}",
+        "Content-Type": "application/json",
+    }
+    payload = {
+        "plan_id": purchase.bundle.code,
+        "recipient": purchase.recipient,
+        "price": float(purchase.amount),
+    }
+    try:
+        r = requests.post(f"{settings.DATADASH_BASE_URL}/v1/orders", headers=headers, json=payload, timeout=15)
+        r.raise_for_status()
+        try:
+            res = r.json()
+        except ValueError:
+            res = {}
+    except requests.RequestException as e:
+        print("deliver_bundle error:", e)
+        return False
+
+    # API may return {success: False, message: ...} with a 200
+    if isinstance(res, dict) and res.get("success") is False:
+        print("deliver_bundle rejected:", res.get("message"))
+        return False
+
+    # Support several possible key names for the order id
+    order = res.get("data") if isinstance(res, dict) and isinstance(res.get("data"), dict) else res
+    order_id = None
+    if isinstance(order, dict):
+        order_id = order.get("order_id") or order.get("id") or order.get("reference") or order.get("transaction_id")
+
+    purchase.delivered = True
+    purchase.api_transaction_id = str(order_id)[:50] if order_id else None
+    purchase.save(update_fields=["delivered", "api_transaction_id"])
+    return True
+
+
 def sync_datadash_plans():
     """
     Fetch /v1/plans from DataDash and sync with local Bundle model.
@@ -38,6 +82,7 @@ def sync_datadash_plans():
         if not data:
             return False
 
+        resolver = get_resolver()
         for p in data:
             # Support several possible key names
             plan_id = p.get("plan_id") or p.get("id") or p.get("code")
@@ -53,15 +98,20 @@ def sync_datadash_plans():
             if not plan_id:
                 continue
 
+            defaults = {
+                "name": str(name),
+                "price": price,
+                "description": p.get("description", "") or "",
+            }
+
+            # Network from the plan itself, else from its name (not description), e.g. "Telecel 2GB"
+            network = resolver.canonical_network(p.get("network") or p.get("network_name")) \
+                or resolver.guess_network(str(name))
+            if network:
+                defaults["network"] = network
+
             # Upsert
-            Bundle.objects.update_or_create(
-                code=str(plan_id),
-                defaults={
-                    "name": str(name),
-                    "price": price,
-                    "description": p.get("description", "") or "",
-                },
-            )
+            Bundle.objects.update_or_create(code=str(plan_id), defaults=defaults)
         return True
     except Exception as e:
         print("sync_datadash_plans error:", e)
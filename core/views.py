@@ -2,15 +2,21 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.conf import settings
-from django.http import HttpResponse
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from decimal import Decimal
-import requests
 import json
 from django.utils.timezone import now
 from .forms import SignupForm
-from .models import Bundle, Purchase
+from .models import Bundle, Purchase, WalletTransaction, new_reference
+from .networks import get_resolver
+from .utils import deliver_bundle
+from .wallet import InsufficientFunds, debit, refund
+from .paystack import (
+    WEBHOOK_MAX_BYTES, submit_initialize, get_cached_checkout, claim_checkout, wait_for_checkout, cache_checkout,
+    clear_checkout, verify_signature,
+)
 
 
 # -------------------------
@@ -78,38 +84,139 @@ def buy_bundle(request):
             messages.error(request, "Invalid bundle selected.")
             return redirect("buy_bundle")
 
+        # Make sure the bundle is for the recipient's network before taking payment
+        resolver = get_resolver()
+        digits = resolver.normalize(recipient)
+        network = resolver.lookup(digits)
+        if network is None:
+            messages.error(request, "Please enter a valid Ghana phone number.")
+            return redirect("buy_bundle")
+        if resolver.canonical_network(bundle.network) != network:
+            messages.error(request, f"{recipient} is a {network} number. Please select a {network} bundle.")
+            return redirect("buy_bundle")
+        recipient = digits
+
         user = request.user
         amount = bundle.price
 
-        # Create purchase record
-        purchase = Purchase.objects.create(
-            user=user, recipient=recipient, bundle=bundle, amount=amount, paid=False
+        # Agents can pay from their prepaid wallet, skipping Paystack entirely
+        profile = getattr(user, "profile", None)
+        if request.POST.get("pay_with") == "wallet":
+            if not (profile and profile.is_agent):
+                messages.error(request, "Only agents can pay from a wallet.")
+                return redirect("buy_bundle")
+            try:
+                with transaction.atomic():
+                    purchase = Purchase.objects.create(
+                        user=user, recipient=recipient, bundle=bundle, amount=amount, paid=True, paid_at=now()
+                    )
+                    debit(profile, amount, purchase=purchase, note=f"{bundle.name} to {recipient}")
+            except InsufficientFunds:
+                messages.error(request, "Insufficient wallet balance. Please top up or pay with Paystack.")
+                return redirect("buy_bundle")
+
+            # The debit is committed; any failure from here on must give the money back
+            try:
+                delivered = deliver_bundle(purchase)
+            except Exception as e:
+                print("wallet delivery error:", e)
+                delivered = False
+
+            if not delivered:
+                # Give the agent their money back; the purchase stays recorded as undelivered
+                refund(profile, amount, purchase, note=f"Delivery failed: {bundle.name} to {recipient}")
+                messages.error(request, "Delivery failed. Your wallet has been refunded; please try again.")
+                return redirect("my_purchases")
+            messages.success(request, f"{bundle.name} sent to {recipient}.")
+            return redirect("my_purchases")
+
+        # A double-click or resubmission reuses the first authorization URL
+        auth_url = get_cached_checkout(user.id, recipient, bundle.id)
+        if auth_url:
+            return redirect(auth_url)
+
+        # Only one of several identical in-flight submissions calls Paystack; the rest wait for its URL
+        if not claim_checkout(user.id, recipient, bundle.id):
+            auth_url = wait_for_checkout(user.id, recipient, bundle.id)
+            if auth_url:
+                return redirect(auth_url)
+            messages.error(request, "Your previous payment attempt did not complete. Please try again.")
+            return redirect("buy_bundle")
+
+        # Reference is generated up front so Paystack and the insert run concurrently
+        reference = new_reference()
+        future = submit_initialize(
+            email=user.email,
+            amount=amount,
+            reference=reference,
+            callback_url=request.build_absolute_uri("/paystack-webhook/"),
+            recipient=recipient,
         )
 
-        # Initialize Paystack payment
-        headers = {"Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}"}
-        data = {
-            "email": user.email,
-            "amount": int(amount * 100),
-            "reference": str(purchase.id),
-            "callback_url": request.build_absolute_uri("/paystack-webhook/"),
-            "metadata": {"custom_fields": [{"display_name": "Recipient", "variable_name": "recipient", "value": recipient}]}
-        }
+        # Create purchase record
+        try:
+            Purchase.objects.create(
+                user=user, recipient=recipient, bundle=bundle, amount=amount, paid=False, reference=reference
+            )
+        except Exception as e:
+            # Drop the initialize call. If it already reached Paystack, its URL is never shown to
+            # anyone, so that reference cannot be paid and has no Purchase to match.
+            future.cancel()
+            clear_checkout(user.id, recipient, bundle.id)
+            messages.error(request, f"Could not record your purchase: {e}")
+            return redirect("buy_bundle")
 
         try:
-            r = requests.post("https://api.paystack.co/transaction/initialize", headers=headers, json=data)
-            res = r.json()
-            if res.get("status"):
-                auth_url = res["data"]["authorization_url"]
-                return redirect(auth_url)
-            else:
-                messages.error(request, f"Payment initialization failed: {res.get('message')}")
+            auth_url = future.result()
+            cache_checkout(user.id, recipient, bundle.id, reference, auth_url)
+            return redirect(auth_url)
+        except ValueError as e:
+            messages.error(request, f"Payment initialization failed: {e}")
         except Exception as e:
             messages.error(request, f"Error initializing payment: {e}")
 
+        # Release the claim so a retry can start a fresh checkout
+        clear_checkout(user.id, recipient, bundle.id)
         return redirect("buy_bundle")
 
-    return render(request, "core/buy_bundle.html", {"bundles": bundles})
+    # Canonical network per bundle, so "Vodafone" or "AT" bundles show correctly
+    resolver = get_resolver()
+    bundles = list(bundles)
+    for b in bundles:
+        b.network_name = resolver.canonical_network(b.network)
+
+    # ?recipient=... narrows the catalog to that number's network
+    recipient = request.GET.get("recipient", "")
+    digits = resolver.normalize(recipient)
+    network = resolver.lookup(digits)
+    if network:
+        bundles = resolver.filter_bundles(bundles, network)
+
+    return render(request, "core/buy_bundle.html", {
+        "bundles": bundles,
+        "recipient": digits or recipient,
+        "profile": getattr(request.user, "profile", None),
+    })
+
+
+# -------------------------
+# Recipient Network Lookup
+# -------------------------
+@login_required
+def resolve_network(request):
+    recipient = request.GET.get("recipient", "")
+    resolver = get_resolver()
+    digits = resolver.normalize(recipient)
+    network = resolver.lookup(digits)
+    bundle_ids = []
+    if network:
+        bundle_ids = [b.id for b in resolver.filter_bundles(Bundle.objects.only("id", "network"), network)]
+    return JsonResponse({
+        "recipient": digits,
+        "valid": network is not None,
+        "network": network,
+        "bundle_ids": bundle_ids,
+    })
 
 
 # -------------------------
@@ -126,8 +233,27 @@ def my_purchases(request):
 # -------------------------
 @csrf_exempt
 def paystack_webhook(request):
+    # Cheap checks first: size, signature and event type before any JSON parsing
+    try:
+        content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        return HttpResponse(status=400)
+    if content_length > WEBHOOK_MAX_BYTES:
+        return HttpResponse(status=413)
+
+    body = request.body
+    if len(body) > WEBHOOK_MAX_BYTES:
+        return HttpResponse(status=413)
+
+    if not verify_signature(body, request.headers.get("x-paystack-signature", "")):
+        return HttpResponse(status=401)
+
+    # Only charge.success is handled; acknowledge anything else without parsing it
+    if b"charge.success" not in body:
+        return HttpResponse(status=200)
+
     try:
-        payload = json.loads(request.body.decode("utf-8"))
+        payload = json.loads(body)
     except Exception:
         return HttpResponse(status=400)
 
@@ -137,22 +263,14 @@ def paystack_webhook(request):
     if event == "charge.success":
         reference = data.get("reference")
         try:
-            purchase = Purchase.objects.get(id=reference, paid=False)
+            purchase = Purchase.objects.get(reference=reference, paid=False)
             purchase.paid = True
             purchase.paid_at = now()
             purchase.save()
+            clear_checkout(purchase.user_id, purchase.recipient, purchase.bundle_id)
 
             # Deliver bundle via DataDash
-            headers = {
-                "Authorization": f"Bearer {settings.DATADASH_API_KEY}",
-                "Content-Type": "application/json",
-            }
-            payload = {
-                "plan_id": purchase.bundle.code,
-                "recipient": purchase.recipient,
-                "price": float(purchase.amount),
-            }
-            requests.post(f"{settings.DATADASH_BASE_URL}/v1/orders", headers=headers, json=payload)
+            deliver_bundle(purchase)
 
         except Purchase.DoesNotExist:
             pass
@@ -162,6 +280,7 @@ def paystack_webhook(request):
 
 @login_required
 def profile(request):
-    return render(request, "core/profile.html", {"user": request.user})
+    wallet_transactions = WalletTransaction.objects.filter(profile__user=request.user)[:20]
+    return render(request, "core/profile.html", {"user": request.user, "wallet_transactions": wallet_transactions})
 def payment_success(request):
     return render(request, 'core/payment_success.html')
\ No newline at end of file
@@ -0,0 +1,74 @@
+# core/wallet.py
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+
+from .models import Profile, WalletTransaction
+
+
+class InsufficientFunds(Exception):
+    pass
+
+
+def _apply(profile_id, amount, kind, purchase=None, note=""):
+    """
+    Change the cached balance with a single F() UPDATE and append the ledger row.
+    Must run inside transaction.atomic().
+    """
+    # Row lock serialises concurrent debits/credits for the same agent
+    Profile.objects.select_for_update().filter(pk=profile_id).values_list("pk", flat=True).get()
+
+    rows = Profile.objects.filter(pk=profile_id)
+    if amount < 0:
+        # Guard in the UPDATE itself so the balance can never go negative
+        rows = rows.filter(wallet_balance__gte=-amount)
+    if not rows.update(wallet_balance=F("wallet_balance") + amount):
+        raise InsufficientFunds("Insufficient wallet balance.")
+
+    balance = Profile.objects.filter(pk=profile_id).values_list("wallet_balance", flat=True).get()
+    return WalletTransaction.objects.create(
+        profile_id=profile_id,
+        kind=kind,
+        amount=amount,
+        balance_after=balance,
+        purchase=purchase,
+        note=note,
+    )
+
+
+def credit(profile, amount, note=""):
+    """Top up an agent's wallet. Returns the ledger entry."""
+    amount = Decimal(amount)
+    if amount <= 0:
+        raise ValueError("Top-up amount must be positive.")
+    with transaction.atomic():
+        return _apply(profile.pk, amount, WalletTransaction.TOPUP, note=note)
+
+
+def debit(profile, amount, purchase=None, note=""):
+    """
+    Take amount from an agent's wallet. Raises InsufficientFunds and leaves
+    the balance untouched if there is not enough money.
+    """
+    amount = Decimal(amount)
+    if amount <= 0:
+        raise ValueError("Debit amount must be positive.")
+    with transaction.atomic():
+        return _apply(profile.pk, -amount, WalletTransaction.PURCHASE, purchase=purchase, note=note)
+
+
+def refund(profile, amount, purchase, note=""):
+    """Give back a wallet debit whose bundle could not be delivered. Returns the ledger entry."""
+    amount = Decimal(amount)
+    if amount <= 0:
+        raise ValueError("Refund amount must be positive.")
+    with transaction.atomic():
+        return _apply(profile.pk, amount, WalletTransaction.REFUND, purchase=purchase, note=note)
+
+
+def ledger_balance(profile):
+    """Balance recomputed from the ledger, for reconciling the cached value."""
+    total = WalletTransaction.objects.filter(profile=profile).aggregate(total=Sum("amount"))["total"]
+    return total or Decimal("0.00")
+
@@ -1,13 +1,12 @@
 from pathlib import Path
 import os
-from dotenv import load_dotenv
 from decouple import config
 
 # -----------------------------------
 # Load environment variables
 # -----------------------------------
+# decouple reads os.environ first, then BASE_DIR/.env; no separate dotenv load needed
 BASE_DIR = Path(__file__).resolve().parent.parent
-load_dotenv(BASE_DIR / '.env')
 
 # -----------------------------------
 # Basic Django settings
@@ -72,11 +71,25 @@ WSGI_APPLICATION = 'richdatabundle_project.wsgi.application'
 import dj_database_url
 
 DATABASES = {
-    'default': dj_database_url.config(
-        default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}"  # fallback to SQLite
+    'default': dj_database_url.parse(
+        config('DATABASE_URL', default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}")  # fallback to SQLite
     )
 }
 
+# -----------------------------------
+# Cache
+# -----------------------------------
+# Default LocMemCache is per gunicorn worker, so checkout de-duplication only
+# covers resubmissions that reach the same worker. For a shared cache set e.g.
+# CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache and
+# CACHE_LOCATION=django_cache (then run `manage.py createcachetable`).
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
 # -----------------------------------
 # Password Validators
 # -----------------------------------